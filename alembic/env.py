@@ -10,8 +10,10 @@ from alembic import context
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. In-process callers that pass a
+# connection have already configured logging, and fileConfig would
+# disable their existing loggers.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -57,6 +59,18 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # Callers that already hold a connection (reset_database.py) pass it in
+    # so the migrations run inside their transaction
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     # Load environment variables
     from dotenv import load_dotenv
     load_dotenv()
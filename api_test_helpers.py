@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the API test scripts
+"""
+
+import base64
+import http.client
+import os
+import threading
+import time
+from pathlib import Path
+import orjson
+
+# Bearer tokens from earlier runs, keyed by "<token url>|<username>"
+TOKEN_CACHE_PATH = Path.home() / ".apiproject_test_tokens.json"
+# Cached tokens with less life left than this (seconds) are not reused
+TOKEN_MIN_TTL = 60
+# Tenant and API user shared by the test scripts, keyed by API base URL
+BOOTSTRAP_CACHE_PATH = Path.home() / ".apiproject_test_bootstrap.json"
+API_USER_PASSWORD = "testpassword123"
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# http.client connections are not thread-safe, so each thread keeps its own
+_raw_conns = threading.local()
+
+def json_body(response):
+    """Decode a response body with orjson instead of requests' stdlib json"""
+    return orjson.loads(response.content)
+
+def send_json(session, method, url, body):
+    """Send a request with an orjson-encoded JSON body"""
+    return session.request(method, url, data=orjson.dumps(body), headers=JSON_HEADERS)
+
+def raw_get(host, port, path, token):
+    """Plain keep-alive GET that skips requests' per-call overhead, returning (status, body)"""
+    conns = _raw_conns.__dict__
+    conn = conns.get((host, port))
+    if conn is None:
+        conn = conns[(host, port)] = http.client.HTTPConnection(host, port, timeout=10)
+    for attempt in range(2):
+        try:
+            conn.request("GET", path, headers={"Authorization": f"Bearer {token}"})
+            response = conn.getresponse()
+            return response.status, response.read()
+        except ConnectionError:
+            # The server closed the idle keep-alive socket; reconnect once
+            conn.close()
+            if attempt:
+                raise
+
+def _token_exp(token):
+    """Read the exp claim from a JWT without verifying it"""
+    payload = token.split(".")[1]
+    return orjson.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["exp"]
+
+def _load_cache(path):
+    """Load an on-disk cache, treating a missing or corrupt file as empty"""
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+def _save_cache(path, cache):
+    """Write a cache file atomically, readable only by the current user"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(orjson.dumps(cache))
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  Could not write {path}: {e}")
+
+def _drop_cached_token(token_url, username):
+    """Forget a user's cached token so the next get_or_login logs in again"""
+    cache = _load_cache(TOKEN_CACHE_PATH)
+    if cache.pop(f"{token_url}|{username}", None) is not None:
+        _save_cache(TOKEN_CACHE_PATH, cache)
+
+def get_or_login(session, token_url, username, password):
+    """Return a bearer token for the user, reusing a cached one while it is still valid"""
+    key = f"{token_url}|{username}"
+    cache = _load_cache(TOKEN_CACHE_PATH)
+    cached = cache.get(key)
+    if cached and cached["exp"] - time.time() > TOKEN_MIN_TTL:
+        return cached["token"]
+
+    # Password grants pay the server's password hash check, so only log in on a miss
+    response = session.post(token_url, data={"username": username, "password": password})
+    if response.status_code != 200:
+        return None
+
+    token = json_body(response)["access_token"]
+    cache[key] = {"token": token, "exp": _token_exp(token)}
+    _save_cache(TOKEN_CACHE_PATH, cache)
+    return token
+
+def ensure_bootstrap(session, api_url):
+    """Tenant and API user for the test scripts, created once and reused across runs
+
+    The session must carry a super admin bearer token. Returns (tenant, api_token),
+    or None if they could not be created.
+    """
+    token_url = f"{api_url}/auth/token"
+    cache = _load_cache(BOOTSTRAP_CACHE_PATH)
+    cached = cache.get(api_url)
+    if cached:
+        # A database reset restarts IDs, so the cached IDs may now belong to someone
+        # else; only reuse them if the user is still ours and still in our tenant
+        response = session.get(f"{api_url}/admin/users/{cached.get('user_id')}")
+        user = json_body(response) if response.status_code == 200 else None
+        if user and user["email"] == cached["email"] and user["tenant_id"] == cached["tenant"]["id"]:
+            api_token = get_or_login(session, token_url, cached["email"], API_USER_PASSWORD)
+            if api_token:
+                return cached["tenant"], api_token
+        # Stale, and so is the cached JWT of that user
+        del cache[api_url]
+        _save_cache(BOOTSTRAP_CACHE_PATH, cache)
+        _drop_cached_token(token_url, cached["email"])
+
+    # The PID keeps names unique when parallel workers bootstrap in the same second
+    suffix = f"{int(time.time())}{os.getpid()}"
+    tenant_data = {
+        "name": f"Test Company {suffix}",
+        "domain": f"test{suffix}.com",
+        "is_active": True
+    }
+    user_data = {
+        "full_name": "Test API User",
+        "email": f"api{suffix}@test.com",
+        "password": API_USER_PASSWORD,
+        "role": "API_USER",
+        "is_active": True
+    }
+    # One bootstrap call creates both in a single round trip and transaction
+    response = send_json(session, "POST", f"{api_url}/admin/bootstrap/",
+                         {"tenant": tenant_data, "users": [user_data]})
+    if response.status_code != 200:
+        print(f"❌ Failed to create tenant and API user: {response.text}")
+        return None
+
+    result = json_body(response)
+    tenant = result["tenant"]
+    cache[api_url] = {"tenant": tenant, "user_id": result["users"][0]["id"], "email": user_data["email"]}
+    _save_cache(BOOTSTRAP_CACHE_PATH, cache)
+    api_token = get_or_login(session, token_url, user_data["email"], API_USER_PASSWORD)
+    return (tenant, api_token) if api_token else None
\ No newline at end of file
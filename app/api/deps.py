@@ -1,41 +1,128 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from typing import Dict, Optional
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.orm import make_transient_to_detached
+from app.core import auth_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.core.security import verify_token
 from app.crud import user as user_crud
-from app.models.user import UserRole
+from app.models.user import User, UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+# Built once and re-raised; with_traceback(None) stops frames piling up on the shared instance
+_CREDENTIALS_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+_PERMISSIONS_EXCEPTION = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN,
+    detail="Not enough permissions"
+)
+
+# Token hash -> future of the verification already running for it, so a burst
+# of requests carrying the same token does the JWT + DB work only once
+_inflight: Dict[str, asyncio.Future] = {}
+
+def _user_to_cache(user: User) -> dict:
+    """Serialize the user columns needed by request handlers (never the password hash)"""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "full_name": user.full_name,
+        "role": user.role,
+        "is_active": user.is_active,
+        "tenant_id": user.tenant_id,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+        "updated_at": user.updated_at.isoformat() if user.updated_at else None
+    }
+
+def _user_from_cache(data: dict) -> User:
+    """Rebuild a cached user as a detached instance, without a SELECT or a session"""
+    user = User(
+        id=data["id"],
+        email=data["email"],
+        full_name=data["full_name"],
+        role=data["role"],
+        is_active=data["is_active"],
+        tenant_id=data["tenant_id"],
+        created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+        updated_at=datetime.fromisoformat(data["updated_at"]) if data["updated_at"] else None
     )
+    make_transient_to_detached(user)
+    return user
+
+async def _resolve_user(token: str, token_hash: str) -> Optional[dict]:
+    """Verify a token and return the cache payload of its user, or None if invalid"""
+    cached = await auth_cache.get_cached_user(token_hash)
+    if cached is not None:
+        return cached
     
-    payload = verify_token(token)
+    # JWT decoding is CPU-bound, keep it off the event loop
+    payload = await run_in_threadpool(verify_token, token)
     if payload is None:
-        raise credentials_exception
+        return None
     
     email: str = payload.get("sub")
     if email is None:
-        raise credentials_exception
+        return None
     
-    user = user_crud.get_user_by_email(db=db, email=email)
-    if user is None:
-        raise credentials_exception
+    # A short-lived async session: the lookup never blocks the loop, and its
+    # connection goes back to the pool before the endpoint runs
+    async with AsyncSessionLocal() as session:
+        user = await user_crud.get_user_by_email_async(session, email)
+        if user is None:
+            return None
+        data = _user_to_cache(user)
     
-    return user
+    # Never cache past the token's own expiry
+    ttl = min(settings.AUTH_CACHE_TTL, int(payload.get("exp", 0) - time.time()))
+    await auth_cache.set_cached_user(token_hash, data, ttl)
+    return data
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    
+    future = _inflight.get(token_hash)
+    if future is not None:
+        try:
+            data = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Only the leader was cancelled, not this request; verify the token ourselves
+            if not future.cancelled():
+                raise
+            data = await _resolve_user(token, token_hash)
+    else:
+        future = asyncio.get_running_loop().create_future()
+        _inflight[token_hash] = future
+        try:
+            data = await _resolve_user(token, token_hash)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved so a leader without followers does not log "never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(data)
+        finally:
+            _inflight.pop(token_hash, None)
+            if not future.done():
+                future.cancel()
+    
+    if data is None:
+        raise _CREDENTIALS_EXCEPTION.with_traceback(None)
+    
+    # Detached: endpoints needing relationships attach it to their own session
+    return _user_from_cache(data)
 
 def get_current_super_admin(current_user = Depends(get_current_user)):
     if current_user.role != UserRole.SUPER_ADMIN:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+        raise _PERMISSIONS_EXCEPTION.with_traceback(None)
     return current_user 
\ No newline at end of file
@@ -1,53 +1,82 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse, Response
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from typing import List, Optional
+from app.core import cache
+from app.core.config import settings
+from app.core.database import get_db, get_async_db
 from app.core.security import verify_token, create_access_token
 from app.schemas.tenant import Tenant, TenantCreate, TenantUpdate
+from app.schemas.bootstrap import TenantBootstrap, TenantBootstrapResult
 from app.schemas.user import User, UserCreate, UserUpdate
 from app.crud import tenant as tenant_crud
 from app.crud import user as user_crud
+from app.models.user import API_ACCESS_ROLES
 from app.api.deps import get_current_super_admin
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], default_response_class=ORJSONResponse)
 
 # Tenant Management
 @router.post("/tenants/", response_model=Tenant)
-def create_tenant(
+async def create_tenant(
     tenant: TenantCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_super_admin)
 ):
-    return tenant_crud.create_tenant(db=db, tenant=tenant)
+    return await tenant_crud.create_tenant(db=db, tenant=tenant)
+
+@router.post("/bootstrap/", response_model=TenantBootstrapResult)
+async def bootstrap_tenant(
+    bootstrap: TenantBootstrap,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_super_admin)
+):
+    """Create a tenant and its initial users in one request and one transaction"""
+    created = await tenant_crud.create_tenant_with_users(db=db, tenant=bootstrap.tenant, users=bootstrap.users)
+    if created is None:
+        raise HTTPException(status_code=400, detail="Tenant or user email already registered")
+    tenant, users = created
+    return {"tenant": tenant, "users": users}
 
 @router.get("/tenants/", response_model=List[Tenant])
-def get_tenants(
+async def get_tenants(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_super_admin)
 ):
-    return tenant_crud.get_tenants(db=db, skip=skip, limit=limit)
+    cache_key = await cache.build_key(tenant_crud.TENANTS_CACHE_NAMESPACE, "list", skip, limit, after_id)
+    cached = await cache.get_cached(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    tenants = await tenant_crud.get_tenants(db=db, skip=skip, limit=limit, after_id=after_id)
+    body = orjson.dumps([Tenant.model_validate(tenant).model_dump(mode="json") for tenant in tenants])
+    await cache.set_cached(cache_key, body, settings.ADMIN_LIST_CACHE_TTL)
+    return Response(content=body, media_type="application/json")
 
 @router.get("/tenants/{tenant_id}", response_model=Tenant)
-def get_tenant(
+async def get_tenant(
     tenant_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_super_admin)
 ):
-    tenant = tenant_crud.get_tenant(db=db, tenant_id=tenant_id)
-    if not tenant:
+    tenant = await tenant_crud.get_tenant_json(db=db, tenant_id=tenant_id)
+    if tenant is None:
         raise HTTPException(status_code=404, detail="Tenant not found")
-    return tenant
+    return Response(content=tenant, media_type="application/json")
 
 @router.put("/tenants/{tenant_id}", response_model=Tenant)
-def update_tenant(
+async def update_tenant(
     tenant_id: int,
     tenant: TenantUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_super_admin)
 ):
-    updated_tenant = tenant_crud.update_tenant(db=db, tenant_id=tenant_id, tenant=tenant)
+    updated_tenant = await tenant_crud.update_tenant(db=db, tenant_id=tenant_id, tenant=tenant)
     if not updated_tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
     return updated_tenant
@@ -59,16 +88,20 @@ def create_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_super_admin)
 ):
-    return user_crud.create_user(db=db, user=user)
+    db_user = user_crud.create_user(db=db, user=user)
+    if not db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    return db_user
 
 @router.get("/users/", response_model=List[User])
-def get_users(
+async def get_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_super_admin)
 ):
-    return user_crud.get_users(db=db, skip=skip, limit=limit)
+    return await user_crud.get_users(db=db, skip=skip, limit=limit, after_id=after_id)
 
 @router.get("/users/{user_id}", response_model=User)
 def get_user(
@@ -93,7 +126,7 @@ def generate_user_token(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if user.role not in ["api_user", "tenant_admin", "super_admin"]:
+    if user.role not in API_ACCESS_ROLES:
         raise HTTPException(
             status_code=400, 
             detail="Only API users, tenant admins, and super admins can have tokens generated"
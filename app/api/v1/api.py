@@ -1,7 +1,12 @@
 from fastapi import APIRouter
-from app.api.v1 import admin, auth, external
 
-api_router = APIRouter()
-api_router.include_router(auth.router)
-api_router.include_router(admin.router)
-api_router.include_router(external.router) 
\ No newline at end of file
+def build_router() -> APIRouter:
+    """Assemble the v1 router, importing endpoint modules only when it is built"""
+    from app.api.v1 import admin, auth, external
+    
+    router = APIRouter()
+    for module in (auth, admin, external):
+        router.include_router(module.router)
+    return router
+
+api_router = build_router() 
\ No newline at end of file
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.security import create_access_token, create_refresh_token, verify_password, verify_token
+from app.core.security import create_access_token, create_refresh_token, verify_and_update_password, verify_token
 from app.crud import user as user_crud
 from app.schemas.user import User
 from app.api.deps import get_current_user
@@ -17,13 +17,17 @@ def login(
     db: Session = Depends(get_db)
 ):
     user = user_crud.get_user_by_email(db=db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = verify_and_update_password(form_data.password, user.hashed_password) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if new_hash:
+        user_crud.update_password_hash(db=db, db_user=user, hashed_password=new_hash)
+    
     access_token = create_access_token(data={"sub": user.email})
     refresh_token = create_refresh_token(data={"sub": user.email})
     
@@ -56,5 +60,6 @@ def refresh_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
-def read_users_me(current_user: User = Depends(get_current_user)):
-    return current_user 
\ No newline at end of file
+def read_users_me(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    # The response nests the tenant, which lazy loads through this session
+    return db.merge(current_user, load=False) 
\ No newline at end of file
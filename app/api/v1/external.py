@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.api.deps import get_current_user
-from app.models.user import UserRole
+from app.crud import tenant as tenant_crud
+from app.models.user import API_ACCESS_ROLES
 from app.schemas.health import HealthResponse
+from app.schemas.tenant import Tenant
+from app.schemas.user import UserProfile
 from datetime import datetime
 
 router = APIRouter(prefix="/external", tags=["external"])
 
 def get_current_api_user(current_user = Depends(get_current_user)):
     """Ensure the current user is an API user"""
-    if current_user.role not in [UserRole.API_USER, UserRole.TENANT_ADMIN, UserRole.SUPER_ADMIN]:
+    if current_user.role not in API_ACCESS_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied. API users only."
@@ -52,54 +56,36 @@ def service_status(current_user = Depends(get_current_api_user)):
         }
     }
 
-@router.get("/profile")
+@router.get("/profile", response_model=UserProfile)
 def get_user_profile(current_user = Depends(get_current_api_user)):
     """
     Get current user profile.
     
     Returns the profile information for the authenticated API user.
     """
-    return {
-        "id": current_user.id,
-        "email": current_user.email,
-        "full_name": current_user.full_name,
-        "role": current_user.role.value,
-        "tenant_id": current_user.tenant_id,
-        "is_active": current_user.is_active,
-        "created_at": current_user.created_at.isoformat() if current_user.created_at else None,
-        "updated_at": current_user.updated_at.isoformat() if current_user.updated_at else None
-    }
+    return current_user
 
-@router.get("/tenant")
-def get_tenant_info(current_user = Depends(get_current_api_user), db: Session = Depends(get_db)):
+@router.get("/tenant", response_model=Tenant)
+async def get_tenant_info(current_user = Depends(get_current_api_user), db: AsyncSession = Depends(get_async_db)):
     """
     Get tenant information.
     
     Returns information about the tenant associated with the current user.
     """
-    from app.crud.tenant import get_tenant
-    
     if not current_user.tenant_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No tenant associated with this user"
         )
     
-    tenant = get_tenant(db, tenant_id=current_user.tenant_id)
-    if not tenant:
+    tenant = await tenant_crud.get_tenant_json(db, tenant_id=current_user.tenant_id)
+    if tenant is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant not found"
         )
     
-    return {
-        "id": tenant.id,
-        "name": tenant.name,
-        "domain": tenant.domain,
-        "is_active": tenant.is_active,
-        "created_at": tenant.created_at.isoformat() if tenant.created_at else None,
-        "updated_at": tenant.updated_at.isoformat() if tenant.updated_at else None
-    }
+    return Response(content=tenant, media_type="application/json")
 
 @router.post("/echo")
 def echo_message(message: dict, current_user = Depends(get_current_api_user)):
@@ -0,0 +1,64 @@
+from typing import Optional
+import orjson
+import redis
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.logging import logger
+
+# Cache-aside store for resolved bearer tokens. Entries are keyed by the
+# SHA-256 of the token so raw credentials never reach Redis, and every
+# user keeps a set of its cached token hashes for invalidation.
+TOKEN_KEY_PREFIX = "auth:token:"
+USER_TOKENS_KEY_PREFIX = "auth:user_tokens:"
+
+# The async client returns raw bytes, which orjson parses without a decode step
+_async_client = aioredis.from_url(settings.REDIS_URL) if settings.REDIS_URL else None
+_sync_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True) if settings.REDIS_URL else None
+
+async def get_cached_user(token_hash: str) -> Optional[dict]:
+    """Return the cached user payload for a token hash, if any"""
+    if _async_client is None:
+        return None
+    try:
+        raw = await _async_client.get(TOKEN_KEY_PREFIX + token_hash)
+    except RedisError as e:
+        logger.debug("🗃️  Auth cache read failed: %s", e)
+        return None
+    return orjson.loads(raw) if raw else None
+
+async def set_cached_user(token_hash: str, payload: dict, ttl: int):
+    """Store a resolved user payload for a token hash"""
+    if _async_client is None or ttl <= 0:
+        return
+    user_tokens_key = f"{USER_TOKENS_KEY_PREFIX}{payload['id']}"
+    try:
+        async with _async_client.pipeline(transaction=False) as pipe:
+            pipe.set(TOKEN_KEY_PREFIX + token_hash, orjson.dumps(payload), ex=ttl)
+            pipe.sadd(user_tokens_key, token_hash)
+            pipe.expire(user_tokens_key, settings.AUTH_CACHE_TTL)
+            await pipe.execute()
+    except RedisError as e:
+        logger.debug("🗃️  Auth cache write failed: %s", e)
+
+def clear_all():
+    """Drop every auth cache entry, e.g. after the database was reset under it"""
+    if _sync_client is None:
+        return
+    try:
+        keys = list(_sync_client.scan_iter(match="auth:*", count=500))
+        for start in range(0, len(keys), 500):
+            _sync_client.unlink(*keys[start:start + 500])
+    except RedisError as e:
+        logger.warning("⚠️  Auth cache flush failed: %s", e)
+
+def invalidate_user(user_id: int):
+    """Drop every cached token entry for a user"""
+    if _sync_client is None:
+        return
+    user_tokens_key = f"{USER_TOKENS_KEY_PREFIX}{user_id}"
+    try:
+        token_hashes = _sync_client.smembers(user_tokens_key)
+        _sync_client.delete(user_tokens_key, *(TOKEN_KEY_PREFIX + h for h in token_hashes))
+    except RedisError as e:
+        logger.warning("⚠️  Auth cache invalidation failed for user %s: %s", user_id, e)
@@ -0,0 +1,50 @@
+from typing import Optional
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.logging import logger
+
+# Short-TTL response cache for read-mostly admin listings. Each namespace has
+# a version counter that is part of every key, so invalidating a namespace is
+# a single INCR and stale entries simply age out.
+VERSION_KEY_PREFIX = "cache:version:"
+
+_async_client = aioredis.from_url(settings.REDIS_URL) if settings.REDIS_URL else None
+
+async def build_key(namespace: str, *parts) -> Optional[str]:
+    """Build a versioned cache key, or None when caching is unavailable"""
+    if _async_client is None:
+        return None
+    try:
+        version = await _async_client.get(VERSION_KEY_PREFIX + namespace)
+    except RedisError as e:
+        logger.debug("🗃️  Cache version read failed for %s: %s", namespace, e)
+        return None
+    suffix = ":".join(str(part) for part in parts)
+    return f"cache:{namespace}:v{int(version or 0)}:{suffix}"
+
+async def get_cached(key: Optional[str]) -> Optional[bytes]:
+    if _async_client is None or key is None:
+        return None
+    try:
+        return await _async_client.get(key)
+    except RedisError as e:
+        logger.debug("🗃️  Cache read failed for %s: %s", key, e)
+        return None
+
+async def set_cached(key: Optional[str], value: bytes, ttl: int):
+    if _async_client is None or key is None:
+        return
+    try:
+        await _async_client.set(key, value, ex=ttl)
+    except RedisError as e:
+        logger.debug("🗃️  Cache write failed for %s: %s", key, e)
+
+async def invalidate(namespace: str):
+    """Bump a namespace's version so every cached entry under it is bypassed"""
+    if _async_client is None:
+        return
+    try:
+        await _async_client.incr(VERSION_KEY_PREFIX + namespace)
+    except RedisError as e:
+        logger.warning("⚠️  Cache invalidation failed for %s: %s", namespace, e)
@@ -10,6 +10,10 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 3600
     
     # Security
     SECRET_KEY: str
@@ -23,6 +27,14 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: Optional[str] = None
+    # Kept short: role, is_active or password changes made outside
+    # user_crud.update_user only take effect once entries expire
+    AUTH_CACHE_TTL: int = 60
+    
+    # Response caching for read-mostly endpoints (seconds)
+    EXTERNAL_CACHE_MAX_AGE: int = 5
+    ADMIN_LIST_CACHE_TTL: int = 30
+    TENANT_CACHE_TTL: int = 30
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = []
@@ -1,10 +1,42 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async drivers for the same database, used by the async read endpoints
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(database_url: str):
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+# Both engines share one pool configuration; pre-ping drops dead connections
+# transparently and recycle avoids server-side idle timeouts
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": True,
+}
+
+engine = create_engine(settings.DATABASE_URL, **POOL_OPTIONS)
+# Like the async sessions, don't expire on commit: CRUD writes load their rows with
+# RETURNING, and expiring them would cost a SELECT when the response is serialized
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    poolclass=AsyncAdaptedQueuePool,
+    **POOL_OPTIONS
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
@@ -13,4 +45,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db 
\ No newline at end of file
@@ -1,4 +1,9 @@
+import atexit
+import functools
+import inspect
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 from typing import Optional
@@ -13,6 +18,9 @@ LOG_LEVELS = {
     'CRITICAL': logging.CRITICAL
 }
 
+# Background listener that drains queued records to the real handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors for different log levels"""
     
@@ -54,6 +62,7 @@ def setup_logging(
         log_to_file: Enable file logging
         log_file_path: Path to log file (defaults to logs/app.log)
     """
+    global _queue_listener
     
     # Create logs directory if it doesn't exist
     if log_to_file:
@@ -69,6 +78,9 @@ def setup_logging(
     
     # Clear existing handlers
     logger.handlers.clear()
+    if _queue_listener is not None:
+        _queue_listener.stop()
+    handlers = []
     
     # Console handler with colors
     console_handler = logging.StreamHandler(sys.stdout)
@@ -87,7 +99,7 @@ def setup_logging(
         console_formatter = ColoredFormatter(simple_format)
     
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # File handler (if enabled)
     if log_to_file:
@@ -101,10 +113,25 @@ def setup_logging(
         )
         file_formatter = logging.Formatter(file_format)
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # QueueHandler.prepare() still merges the message arguments on the logging
+    # thread; the handlers' own formatting and the stream/file I/O happen on
+    # the listener thread
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
     
     return logger
 
+@atexit.register
+def _stop_queue_listener():
+    """Flush queued records on interpreter shutdown"""
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str = None) -> logging.Logger:
     """Get a logger instance"""
     if name:
@@ -117,70 +144,84 @@ logger = get_logger()
 def log_function_call(func):
     """Decorator to log function calls and returns"""
     def wrapper(*args, **kwargs):
-        logger.debug(f"🔵 CALLING: {func.__name__} with args={args}, kwargs={kwargs}")
+        logger.debug("🔵 CALLING: %s with args=%s, kwargs=%s", func.__name__, args, kwargs)
         try:
             result = func(*args, **kwargs)
-            logger.debug(f"🟢 RETURNING: {func.__name__} -> {result}")
+            logger.debug("🟢 RETURNING: %s -> %s", func.__name__, result)
             return result
         except Exception as e:
-            logger.error(f"🔴 EXCEPTION in {func.__name__}: {e}")
+            logger.error("🔴 EXCEPTION in %s: %s", func.__name__, e)
             raise
     return wrapper
 
 def log_database_operation(operation: str):
     """Decorator to log database operations"""
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            async def async_wrapper(*args, **kwargs):
+                logger.debug("🗄️  DB %s: %s", operation.upper(), func.__name__)
+                try:
+                    result = await func(*args, **kwargs)
+                    logger.debug("✅ DB %s SUCCESS: %s", operation.upper(), func.__name__)
+                    return result
+                except Exception as e:
+                    logger.error("❌ DB %s FAILED: %s - %s", operation.upper(), func.__name__, e)
+                    raise
+            return async_wrapper
+        
         def wrapper(*args, **kwargs):
-            logger.debug(f"🗄️  DB {operation.upper()}: {func.__name__}")
+            logger.debug("🗄️  DB %s: %s", operation.upper(), func.__name__)
             try:
                 result = func(*args, **kwargs)
-                logger.debug(f"✅ DB {operation.upper()} SUCCESS: {func.__name__}")
+                logger.debug("✅ DB %s SUCCESS: %s", operation.upper(), func.__name__)
                 return result
             except Exception as e:
-                logger.error(f"❌ DB {operation.upper()} FAILED: {func.__name__} - {e}")
+                logger.error("❌ DB %s FAILED: %s - %s", operation.upper(), func.__name__, e)
                 raise
         return wrapper
     return decorator
 
 def log_api_request(method: str, path: str):
     """Log API request details"""
-    logger.info(f"🌐 API REQUEST: {method} {path}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("🌐 API REQUEST: %s %s", method, path)
 
 def log_api_response(status_code: int, response_time: float):
     """Log API response details"""
-    status_emoji = "✅" if status_code < 400 else "❌"
-    logger.info(f"{status_emoji} API RESPONSE: {status_code} ({response_time:.3f}s)")
+    if logger.isEnabledFor(logging.INFO):
+        status_emoji = "✅" if status_code < 400 else "❌"
+        logger.info("%s API RESPONSE: %s (%.3fs)", status_emoji, status_code, response_time)
 
 def log_authentication(user_email: str, success: bool):
     """Log authentication attempts"""
     emoji = "🔓" if success else "🔒"
     status = "SUCCESS" if success else "FAILED"
-    logger.info(f"{emoji} AUTH {status}: {user_email}")
+    logger.info("%s AUTH %s: %s", emoji, status, user_email)
 
 def log_tenant_operation(operation: str, tenant_id: int, tenant_name: str):
     """Log tenant operations"""
-    logger.info(f"🏢 TENANT {operation.upper()}: ID={tenant_id}, Name={tenant_name}")
+    logger.info("🏢 TENANT %s: ID=%s, Name=%s", operation.upper(), tenant_id, tenant_name)
 
 def log_user_operation(operation: str, user_id: int, user_email: str, role: str):
     """Log user operations"""
-    logger.info(f"👤 USER {operation.upper()}: ID={user_id}, Email={user_email}, Role={role}")
+    logger.info("👤 USER %s: ID=%s, Email=%s, Role=%s", operation.upper(), user_id, user_email, role)
 
 def log_token_operation(operation: str, user_email: str, token_type: str):
     """Log token operations"""
-    logger.info(f"🔑 TOKEN {operation.upper()}: User={user_email}, Type={token_type}")
+    logger.info("🔑 TOKEN %s: User=%s, Type=%s", operation.upper(), user_email, token_type)
 
 def log_error(error: Exception, context: str = ""):
     """Log errors with context"""
-    logger.error(f"💥 ERROR in {context}: {error}")
+    logger.error("💥 ERROR in %s: %s", context, error)
 
 def log_warning(message: str, context: str = ""):
     """Log warnings with context"""
-    logger.warning(f"⚠️  WARNING in {context}: {message}")
+    logger.warning("⚠️  WARNING in %s: %s", context, message)
 
 def log_info(message: str, context: str = ""):
     """Log info messages with context"""
-    logger.info(f"ℹ️  INFO in {context}: {message}")
+    logger.info("ℹ️  INFO in %s: %s", context, message)
 
 def log_debug(message: str, context: str = ""):
     """Log debug messages with context"""
-    logger.debug(f"🔍 DEBUG in {context}: {message}") 
\ No newline at end of file
+    logger.debug("🔍 DEBUG in %s: %s", context, message) 
\ No newline at end of file
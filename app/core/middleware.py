@@ -0,0 +1,89 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable
+from app.core.logging import logger, log_api_request, log_api_response
+
+class ResponseCacheMiddleware:
+    """
+    Replay successful GET responses for read-mostly routes from memory.
+    
+    Entries are keyed by path, query string and a hash of the Authorization
+    header, so a cached response is only served back to the same credentials.
+    Cache hits skip routing, dependency resolution and authentication entirely.
+    """
+    
+    def __init__(self, app, paths: Iterable[str], max_age: float = 5, max_entries: int = 10000):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        
+        # Scan the raw header pairs; no Headers mapping or decoding needed
+        authorization = next((value for name, value in scope["headers"] if name == b"authorization"), b"")
+        key = (scope["path"], scope["query_string"], hashlib.sha256(authorization).digest())
+        
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            for message in entry[1]:
+                await send(message)
+            return
+        
+        messages = []
+        
+        async def send_wrapper(message):
+            messages.append(message)
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
+        
+        if messages and messages[0]["type"] == "http.response.start" and messages[0]["status"] == 200:
+            self._entries[key] = (now + self.max_age, messages)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class LogRequestsMiddleware:
+    """
+    Log every HTTP request and its response status and timing.
+    
+    Written as plain ASGI rather than @app.middleware("http") so requests
+    don't pay for BaseHTTPMiddleware's task group and Request/Response
+    wrappers. Timing is taken when the response headers are sent.
+    Probe and docs paths in quiet_paths are passed straight through and
+    only logged at DEBUG.
+    """
+    
+    def __init__(self, app, quiet_paths: Iterable[str] = ()):
+        self.app = app
+        self.quiet_paths = frozenset(quiet_paths)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        if scope["path"] in self.quiet_paths:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🩺 %s %s", scope["method"], scope["path"])
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        log_api_request(scope["method"], scope["path"])
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                log_api_response(message["status"], time.perf_counter() - start_time)
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper) 
\ No newline at end of file
@@ -1,18 +1,53 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Union
-from jose import JWTError, jwt
+from typing import Optional, Tuple, Union
+import jwt
+from jwt import PyJWTError
 from passlib.context import CryptContext
 from app.core.config import settings
 from app.core.logging import logger, log_authentication, log_token_operation
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# argon2 is the default scheme; bcrypt stays verifiable so existing hashes
+# keep working and are upgraded on the next successful login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=1
+)
+
+# Signing parameters are fixed for the process, bind them once instead of per call
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHM = settings.ALGORITHM
+_ACCESS_TOKEN_EXPIRE = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+_REFRESH_TOKEN_EXPIRE = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+_JWT_ALGORITHMS = [_ALGORITHM]
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+
+# Successfully verified tokens, kept until their own exp so repeat callers
+# skip signature checks. Failures are never cached. verify_token runs in
+# worker threads, hence the lock.
+_VERIFIED_TOKEN_CACHE_SIZE = 10000
+_verified_tokens = OrderedDict()
+_verified_tokens_lock = threading.Lock()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     logger.debug("🔐 Verifying password")
     result = pwd_context.verify(plain_password, hashed_password)
-    logger.debug(f"🔐 Password verification result: {result}")
+    logger.debug("🔐 Password verification result: %s", result)
     return result
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if the stored one is outdated"""
+    logger.debug("🔐 Verifying password")
+    verified, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    logger.debug("🔐 Password verification result: %s, rehash: %s", verified, new_hash is not None)
+    return verified, new_hash
+
 def get_password_hash(password: str) -> str:
     logger.debug("🔐 Hashing password")
     hashed = pwd_context.hash(password)
@@ -20,33 +55,46 @@ def get_password_hash(password: str) -> str:
     return hashed
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    logger.debug(f"🔑 Creating access token for user: {data.get('sub', 'unknown')}")
+    logger.debug("🔑 Creating access token for user: %s", data.get('sub', 'unknown'))
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.utcnow() + _ACCESS_TOKEN_EXPIRE
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
     log_token_operation("CREATE", data.get('sub', 'unknown'), "ACCESS")
     return encoded_jwt
 
 def create_refresh_token(data: dict):
-    logger.debug(f"🔑 Creating refresh token for user: {data.get('sub', 'unknown')}")
+    logger.debug("🔑 Creating refresh token for user: %s", data.get('sub', 'unknown'))
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = datetime.utcnow() + _REFRESH_TOKEN_EXPIRE
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
     log_token_operation("CREATE", data.get('sub', 'unknown'), "REFRESH")
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[dict]:
-    logger.debug("🔑 Verifying token")
+    with _verified_tokens_lock:
+        payload = _verified_tokens.get(token)
+        if payload is not None:
+            if payload["exp"] > time.time():
+                _verified_tokens.move_to_end(token)
+                return payload
+            del _verified_tokens[token]
+    
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        logger.debug(f"🔑 Token verified successfully for user: {payload.get('sub', 'unknown')}")
-        return payload
-    except JWTError as e:
-        logger.warning(f"🔑 Token verification failed: {e}")
-        return None 
\ No newline at end of file
+        payload = jwt.decode(token, _SECRET_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔑 Token verified successfully for user: %s", payload.get('sub', 'unknown'))
+    except PyJWTError as e:
+        logger.warning("🔑 Token verification failed: %s", e)
+        return None
+    
+    with _verified_tokens_lock:
+        _verified_tokens[token] = payload
+        if len(_verified_tokens) > _VERIFIED_TOKEN_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    return payload 
\ No newline at end of file
@@ -1,29 +1,94 @@
-from sqlalchemy.orm import Session
+import asyncio
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+import orjson
+from app.core import cache
+from app.core.config import settings
+from app.core.security import get_password_hash
 from app.models.tenant import Tenant
+from app.models.user import User
+from app.schemas import tenant as tenant_schemas
 from app.schemas.tenant import TenantCreate, TenantUpdate
+from app.schemas.user import UserCreate
 
-def get_tenant(db: Session, tenant_id: int):
-    return db.query(Tenant).filter(Tenant.id == tenant_id).first()
+TENANTS_CACHE_NAMESPACE = "tenants"
 
-def get_tenants(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Tenant).offset(skip).limit(limit).all()
+async def get_tenant(db: AsyncSession, tenant_id: int):
+    return await db.get(Tenant, tenant_id)
 
-def create_tenant(db: Session, tenant: TenantCreate):
-    db_tenant = Tenant(**tenant.dict())
-    db.add(db_tenant)
-    db.commit()
-    db.refresh(db_tenant)
+async def get_tenant_json(db: AsyncSession, tenant_id: int) -> Optional[bytes]:
+    """Serialized tenant, served from Redis when possible; updates bump the namespace"""
+    cache_key = await cache.build_key(TENANTS_CACHE_NAMESPACE, "detail", tenant_id)
+    cached = await cache.get_cached(cache_key)
+    if cached is not None:
+        return cached
+    
+    db_tenant = await get_tenant(db, tenant_id)
+    if not db_tenant:
+        return None
+    body = orjson.dumps(tenant_schemas.Tenant.model_validate(db_tenant).model_dump(mode="json"))
+    await cache.set_cached(cache_key, body, settings.TENANT_CACHE_TTL)
+    return body
+
+async def get_tenants(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    query = select(Tenant).order_by(Tenant.id).limit(limit)
+    # Keyset pagination walks the primary key index instead of counting past skipped rows
+    query = query.where(Tenant.id > after_id) if after_id is not None else query.offset(skip)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def create_tenant(db: AsyncSession, tenant: TenantCreate):
+    # RETURNING hands back id and defaults without a follow-up SELECT
+    result = await db.execute(insert(Tenant).values(**tenant.model_dump()).returning(Tenant))
+    db_tenant = result.scalar_one()
+    await db.commit()
+    await cache.invalidate(TENANTS_CACHE_NAMESPACE)
     return db_tenant
 
-def update_tenant(db: Session, tenant_id: int, tenant: TenantUpdate):
-    db_tenant = get_tenant(db, tenant_id)
+async def create_tenant_with_users(db: AsyncSession, tenant: TenantCreate, users: List[UserCreate]):
+    """Tenant plus its users in one transaction; None if the tenant or an email already exists"""
+    # Hash in the threadpool, the password hash is deliberately slow
+    hashed_passwords = await asyncio.gather(
+        *(run_in_threadpool(get_password_hash, user.password) for user in users)
+    )
+    try:
+        result = await db.execute(insert(Tenant).values(**tenant.model_dump()).returning(Tenant))
+        db_tenant = result.scalar_one()
+        db_users = []
+        if users:
+            # One multi-row INSERT ... RETURNING for all users
+            result = await db.scalars(
+                insert(User).returning(User, sort_by_parameter_order=True),
+                [
+                    {
+                        **user.model_dump(exclude={"password", "tenant_id"}, mode="json"),
+                        "hashed_password": hashed_password,
+                        "tenant_id": db_tenant.id,
+                    }
+                    for user, hashed_password in zip(users, hashed_passwords)
+                ],
+            )
+            db_users = result.all()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return None
+    await cache.invalidate(TENANTS_CACHE_NAMESPACE)
+    return db_tenant, db_users
+
+async def update_tenant(db: AsyncSession, tenant_id: int, tenant: TenantUpdate):
+    db_tenant = await get_tenant(db, tenant_id)
     if not db_tenant:
         return None
     
-    update_data = tenant.dict(exclude_unset=True)
+    update_data = tenant.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_tenant, field, value)
     
-    db.commit()
-    db.refresh(db_tenant)
+    await db.commit()
+    await db.refresh(db_tenant)
+    await cache.invalidate(TENANTS_CACHE_NAMESPACE)
     return db_tenant 
\ No newline at end of file
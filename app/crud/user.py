@@ -1,68 +1,114 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import lambda_stmt, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.core import auth_cache
 from app.core.security import get_password_hash
 from app.core.logging import logger, log_database_operation, log_user_operation
 
+# Dialect inserts that support ON CONFLICT clauses
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 @log_database_operation("SELECT")
 def get_user(db: Session, user_id: int):
-    logger.debug(f"🔍 Getting user by ID: {user_id}")
-    user = db.query(User).filter(User.id == user_id).first()
+    logger.debug("🔍 Getting user by ID: %s", user_id)
+    # lambda_stmt caches the constructed statement, only user_id is bound per call
+    user = db.execute(lambda_stmt(lambda: select(User).where(User.id == user_id))).scalars().first()
     if user:
         log_user_operation("RETRIEVE", user.id, user.email, user.role)
     else:
-        logger.warning(f"⚠️  User not found with ID: {user_id}")
+        logger.warning("⚠️  User not found with ID: %s", user_id)
     return user
 
 @log_database_operation("SELECT")
 def get_user_by_email(db: Session, email: str):
-    logger.debug(f"🔍 Getting user by email: {email}")
-    user = db.query(User).filter(User.email == email).first()
+    logger.debug("🔍 Getting user by email: %s", email)
+    user = db.execute(lambda_stmt(lambda: select(User).where(User.email == email))).scalars().first()
+    if user:
+        log_user_operation("RETRIEVE", user.id, user.email, user.role)
+    else:
+        logger.warning("⚠️  User not found with email: %s", email)
+    return user
+
+@log_database_operation("SELECT")
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    """get_user_by_email on an AsyncSession, for lookups made from async code"""
+    logger.debug("🔍 Getting user by email: %s", email)
+    result = await db.execute(lambda_stmt(lambda: select(User).where(User.email == email)))
+    user = result.scalars().first()
     if user:
         log_user_operation("RETRIEVE", user.id, user.email, user.role)
     else:
-        logger.warning(f"⚠️  User not found with email: {email}")
+        logger.warning("⚠️  User not found with email: %s", email)
     return user
 
 @log_database_operation("SELECT")
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    logger.debug(f"🔍 Getting users with skip={skip}, limit={limit}")
-    users = db.query(User).offset(skip).limit(limit).all()
-    logger.info(f"📋 Retrieved {len(users)} users")
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    logger.debug("🔍 Getting users with skip=%s, limit=%s, after_id=%s", skip, limit, after_id)
+    # The response schema nests each user's tenant, load it in the same query
+    query = select(User).options(joinedload(User.tenant)).order_by(User.id).limit(limit)
+    query = query.where(User.id > after_id) if after_id is not None else query.offset(skip)
+    result = await db.execute(query)
+    users = result.scalars().all()
+    logger.info("📋 Retrieved %s users", len(users))
     return users
 
 @log_database_operation("INSERT")
 def create_user(db: Session, user: UserCreate):
-    logger.debug(f"➕ Creating user: {user.email}, role={user.role}, tenant_id={user.tenant_id}")
+    logger.debug("➕ Creating user: %s, role=%s, tenant_id=%s", user.email, user.role, user.tenant_id)
     hashed_password = get_password_hash(user.password)
-    db_user = User(
-        email=user.email,
-        hashed_password=hashed_password,
-        full_name=user.full_name,
-        role=user.role,
-        tenant_id=user.tenant_id,
-        is_active=user.is_active
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    # INSERT ... ON CONFLICT DO NOTHING RETURNING: one round-trip, and a
+    # duplicate email yields no row instead of an IntegrityError
+    insert = _DIALECT_INSERTS[db.get_bind().dialect.name]
+    db_user = db.execute(
+        insert(User)
+        .values(
+            email=user.email,
+            hashed_password=hashed_password,
+            full_name=user.full_name,
+            role=user.role.value,
+            tenant_id=user.tenant_id,
+            is_active=user.is_active
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    ).scalar_one_or_none()
+    if not db_user:
+        db.rollback()
+        logger.warning("⚠️  Cannot create user - email already registered: %s", user.email)
+        return None
+    
     log_user_operation("CREATE", db_user.id, db_user.email, db_user.role)
+    db.commit()
     return db_user
 
 @log_database_operation("UPDATE")
 def update_user(db: Session, user_id: int, user: UserUpdate):
-    logger.debug(f"✏️  Updating user ID: {user_id}")
-    db_user = get_user(db, user_id)
+    logger.debug("✏️  Updating user ID: %s", user_id)
+    update_data = user.model_dump(exclude_unset=True, mode="json")
+    logger.debug("📝 Update data: %s", update_data)
+    if not update_data:
+        return get_user(db, user_id)
+    
+    # Single UPDATE ... RETURNING instead of a SELECT followed by the write
+    db_user = db.execute(
+        update(User).where(User.id == user_id).values(**update_data).returning(User)
+    ).scalar_one_or_none()
     if not db_user:
-        logger.warning(f"⚠️  Cannot update user - not found with ID: {user_id}")
+        logger.warning("⚠️  Cannot update user - not found with ID: %s", user_id)
         return None
     
-    update_data = user.dict(exclude_unset=True)
-    logger.debug(f"📝 Update data: {update_data}")
-    for field, value in update_data.items():
-        setattr(db_user, field, value)
-    
-    db.commit()
-    db.refresh(db_user)
     log_user_operation("UPDATE", db_user.id, db_user.email, db_user.role)
+    db.commit()
+    auth_cache.invalidate_user(user_id)
+    return db_user
+
+@log_database_operation("UPDATE")
+def update_password_hash(db: Session, db_user: User, hashed_password: str):
+    logger.debug("🔐 Upgrading password hash for user ID: %s", db_user.id)
+    db_user.hashed_password = hashed_password
+    db.commit()
     return db_user 
\ No newline at end of file
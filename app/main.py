@@ -1,9 +1,12 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import time
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+import orjson
+import anyio.to_thread
 from app.core.config import settings
-from app.core.logging import setup_logging, logger, log_api_request, log_api_response
+from app.core.database import async_engine, engine
+from app.core.logging import setup_logging, logger
+from app.core.middleware import LogRequestsMiddleware, ResponseCacheMiddleware
 from app.api.v1.api import api_router
 
 # Initialize logging
@@ -16,57 +19,74 @@ logger = setup_logging(
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
-# CORS middleware
-if settings.BACKEND_CORS_ORIGINS:
+@app.on_event("startup")
+def size_threadpool():
+    """Match sync worker threads to DB connections so threads never queue on the pool"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+@app.on_event("shutdown")
+async def dispose_engines():
+    """Close pooled DB connections so workers shut down cleanly"""
+    await async_engine.dispose()
+    engine.dispose()
+
+# Short-lived per-token cache for the read-mostly external endpoints
+app.add_middleware(
+    ResponseCacheMiddleware,
+    paths=[f"{settings.API_V1_STR}/external/{name}" for name in ("health", "status", "ping")],
+    max_age=settings.EXTERNAL_CACHE_MAX_AGE,
+)
+
+# Include API router
+app.include_router(api_router, prefix=settings.API_V1_STR)
+
+# Request/response logging, wrapping the response cache so it also times hits.
+# Probe and docs endpoints are high-frequency noise and only logged at DEBUG.
+app.add_middleware(
+    LogRequestsMiddleware,
+    quiet_paths=["/", "/health", "/docs", "/redoc", app.openapi_url, "/admin/docs", "/external/docs"],
+)
+
+# CORS middleware. Starlette wraps in reverse order of registration, so
+# adding it last makes it outermost and preflights never reach the logging
+# or caching layers.
+CORS_ORIGINS = [str(origin) for origin in settings.BACKEND_CORS_ORIGINS]
+if CORS_ORIGINS:
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
+        allow_origins=CORS_ORIGINS,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
     )
 
-# Include API router
-app.include_router(api_router, prefix=settings.API_V1_STR)
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Middleware to log all API requests and responses"""
-    start_time = time.time()
-    
-    # Log request
-    log_api_request(request.method, str(request.url.path))
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate response time
-    response_time = time.time() - start_time
-    
-    # Log response
-    log_api_response(response.status_code, response_time)
-    
-    return response
+# Static payloads, serialized once at import instead of on every hit
+_ROOT_BODY = orjson.dumps({"message": "Welcome to SaaS API"})
+_HEALTH_BODY = orjson.dumps({"status": "healthy"})
+_ADMIN_DOCS_BODY = orjson.dumps({"message": "Admin API Documentation", "url": "/docs"})
+_EXTERNAL_DOCS_BODY = orjson.dumps({"message": "External API Documentation", "url": "/docs"})
 
 @app.get("/")
-def read_root():
-    return {"message": "Welcome to SaaS API"}
+async def read_root():
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy"}
+async def health_check():
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 # Admin API Documentation
 @app.get("/admin/docs", include_in_schema=False)
-def admin_docs():
+async def admin_docs():
     """Redirect to admin API documentation"""
-    return {"message": "Admin API Documentation", "url": "/docs"}
+    return Response(content=_ADMIN_DOCS_BODY, media_type="application/json")
 
 # External API Documentation
 @app.get("/external/docs", include_in_schema=False)
-def external_docs():
+async def external_docs():
     """Redirect to external API documentation"""
-    return {"message": "External API Documentation", "url": "/docs"} 
\ No newline at end of file
+    return Response(content=_EXTERNAL_DOCS_BODY, media_type="application/json") 
\ No newline at end of file
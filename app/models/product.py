@@ -10,9 +10,9 @@ class Product(Base):
     name = Column(String, index=True)
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id"))
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    tenant = relationship("Tenant", back_populates="products") 
\ No newline at end of file
+    tenant = relationship("Tenant", back_populates="products", lazy="raise") 
\ No newline at end of file
@@ -13,6 +13,7 @@ class Tenant(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    users = relationship("User", back_populates="tenant")
-    products = relationship("Product", back_populates="tenant") 
\ No newline at end of file
+    # Relationships. Collections are never loaded implicitly; callers that
+    # need them must ask for them with selectinload()
+    users = relationship("User", back_populates="tenant", lazy="raise")
+    products = relationship("Product", back_populates="tenant", lazy="raise") 
\ No newline at end of file
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 import enum
 from app.core.database import Base
@@ -10,6 +10,9 @@ class UserRole(str, enum.Enum):
     USER = "USER"
     API_USER = "API_USER"
 
+# Roles allowed to call the external API and to have bearer tokens generated
+API_ACCESS_ROLES = frozenset({UserRole.API_USER, UserRole.TENANT_ADMIN, UserRole.SUPER_ADMIN})
+
 class User(Base):
     __tablename__ = "users"
     
@@ -17,11 +20,16 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     full_name = Column(String)
-    role = Column(Enum(UserRole), default=UserRole.USER)
+    # Plain string instead of a native ENUM type; validated against UserRole below
+    role = Column(String(16), default=UserRole.USER.value)
     is_active = Column(Boolean, default=True)
-    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    tenant = relationship("Tenant", back_populates="users", lazy="select") 
\ No newline at end of file
+    tenant = relationship("Tenant", back_populates="users", lazy="select")
+    
+    @validates("role")
+    def validate_role(self, key, value):
+        return UserRole(value).value 
\ No newline at end of file
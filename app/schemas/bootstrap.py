@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+from app.schemas.tenant import Tenant, TenantCreate
+from app.schemas.user import UserCreate, UserProfile
+
+class TenantBootstrap(BaseModel):
+    tenant: TenantCreate
+    # tenant_id on each user is ignored; they all join the new tenant
+    users: List[UserCreate] = []
+
+class TenantBootstrapResult(BaseModel):
+    tenant: Tenant
+    users: List[UserProfile] 
\ No newline at end of file
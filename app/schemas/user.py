@@ -28,5 +28,15 @@ class User(UserBase):
     created_at: datetime
     updated_at: datetime
     
+    class Config:
+        from_attributes = True
+
+class UserProfile(UserBase):
+    id: int
+    is_active: bool
+    tenant_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
     class Config:
         from_attributes = True 
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+pytest configuration for the live API test scripts
+
+Run them in parallel with: pytest -n auto
+"""
+
+import socket
+import pytest
+
+API_HOST = "localhost"
+API_PORT = 8000
+
+# Standalone scripts that are run directly rather than collected
+collect_ignore = ["test_token_generation.py", "test_user_creation.py"]
+
+@pytest.fixture(scope="session")
+def api_server():
+    """Skip the live API tests when no server is listening"""
+    try:
+        socket.create_connection((API_HOST, API_PORT), timeout=1).close()
+    except OSError:
+        pytest.skip(f"API server not running on {API_HOST}:{API_PORT}") 
\ No newline at end of file
@@ -3,6 +3,7 @@
 Server Management Script for SaaS API and Unified Console
 """
 
+import asyncio
 import subprocess
 import sys
 import time
@@ -11,132 +12,218 @@ import signal
 import psutil
 from pathlib import Path
 
-def check_port(port):
-    """Check if a port is in use and return PIDs"""
+def _check_port_lsof(port):
+    """lsof fallback for platforms where psutil needs root to list sockets (macOS)"""
+    # -iTCP:<port> limits lsof to that port's sockets; -n/-P skip name lookups
     try:
-        # Try lsof first
-        result = subprocess.run(['lsof', '-ti', str(port)], 
+        result = subprocess.run(['lsof', '-nP', f'-iTCP:{port}', '-sTCP:LISTEN', '-t'], 
                               capture_output=True, text=True)
-        pids = result.stdout.strip().split('\n') if result.stdout.strip() else []
-        pids = [pid for pid in pids if pid]
-        
-        # If lsof doesn't work, try socket connection
-        if not pids:
-            import socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            try:
-                result = sock.connect_ex(('localhost', port))
-                if result == 0:
-                    # Port is in use, but we can't get PID with socket method
-                    return ['unknown']
-            except:
-                pass
-            finally:
-                sock.close()
-        
-        return pids
-    except Exception:
+    except OSError:
         return []
+    pids = result.stdout.strip().split('\n') if result.stdout.strip() else []
+    return [pid for pid in pids if pid]
+
+# Recent scan results, {port: (monotonic timestamp, pids)}, so back-to-back
+# lookups share one socket table read
+_port_cache = {}
+_PORT_CACHE_TTL = 0.2
+
+def _invalidate_port_cache(port):
+    """Drop a port's cached PIDs so the next lookup rescans"""
+    _port_cache.pop(port, None)
+
+def _scan_ports(ports):
+    """Map each port to the PIDs listening on it, from one socket table read"""
+    try:
+        connections = psutil.net_connections(kind='inet')
+    except psutil.AccessDenied:
+        pids = {port: _check_port_lsof(port) for port in ports}
+    else:
+        pids = {port: [] for port in ports}
+        for conn in connections:
+            if conn.laddr and conn.laddr.port in pids and conn.status == psutil.CONN_LISTEN and conn.pid:
+                pids[conn.laddr.port].append(str(conn.pid))
+    
+    now = time.monotonic()
+    for port, port_pids in pids.items():
+        _port_cache[port] = (now, port_pids)
+    return pids
+
+def check_port(port):
+    """Check if a port is in use and return PIDs"""
+    cached = _port_cache.get(port)
+    if cached and time.monotonic() - cached[0] < _PORT_CACHE_TTL:
+        return cached[1]
+    return _scan_ports({port})[port]
+
+def _wait_port_free(port, timeout=5):
+    """Poll until nothing listens on the port, backing off from 10ms to 200ms"""
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while True:
+        # Scan directly; the 200ms port cache would hide a port freeing up
+        if not _scan_ports({port})[port]:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 0.2)
 
-def kill_processes_on_port(port):
+def kill_processes_on_port(port, pids=None):
     """Kill all processes on a specific port with force if needed"""
-    pids = check_port(port)
+    if pids is None:
+        pids = check_port(port)
     if pids:
         print(f"🛑 Stopping processes on port {port}...")
-        for pid in pids:
-            if pid:
+        killed = set()
+        # psutil reports one PID per socket, so a socket shared with a parent
+        # (uvicorn's --reload supervisor) only shows up once the child is gone
+        while pids:
+            for pid in pids:
+                killed.add(pid)
                 try:
-                    # First try graceful termination
-                    subprocess.run(['kill', pid], timeout=5)
-                    time.sleep(0.5)
-                    
-                    # Check if process is still running
-                    if psutil.pid_exists(int(pid)):
+                    # First try graceful termination, waiting on the process itself
+                    process = psutil.Process(int(pid))
+                    process.terminate()
+                    try:
+                        process.wait(timeout=0.5)
+                        print(f"   Killed process {pid}")
+                    except psutil.TimeoutExpired:
                         # Force kill if still running
-                        subprocess.run(['kill', '-9', pid])
+                        process.kill()
                         print(f"   Force killed process {pid}")
-                    else:
-                        print(f"   Killed process {pid}")
-                except Exception as e:
+                except psutil.NoSuchProcess:
+                    print(f"   Killed process {pid}")
+                except psutil.Error as e:
                     print(f"   Failed to kill process {pid}: {e}")
-                    # Try force kill as last resort
-                    try:
-                        subprocess.run(['kill', '-9', pid])
-                        print(f"   Force killed process {pid}")
-                    except:
-                        pass
-        time.sleep(1)
+            _invalidate_port_cache(port)
+            pids = [pid for pid in check_port(port) if pid not in killed]
         
         # Verify port is free
-        remaining_pids = check_port(port)
-        if remaining_pids:
-            print(f"⚠️  Warning: Port {port} still has processes: {remaining_pids}")
-        else:
+        if _wait_port_free(port, 5):
             print(f"✅ Port {port} is free")
+        else:
+            print(f"⚠️  Warning: Port {port} still has processes: {check_port(port)}")
     else:
         print(f"✅ Port {port} is free")
 
-def wait_for_port(port, timeout=30):
-    """Wait for a port to become available (server started)"""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        pids = check_port(port)
-        if pids:  # Port is in use (server started)
-            print(f"✅ Port {port} is now in use by PIDs: {pids}")
-            return True
-        time.sleep(0.5)
-    print(f"❌ Port {port} did not become available within {timeout} seconds")
+# Servers started by this process, keyed by port
+_server_processes = {}
+
+async def _stop_server(port, timeout=5):
+    """Terminate a server this process started and reap it, killing it if it hangs"""
+    process = _server_processes.pop(port, None)
+    if process is None or process.returncode is not None:
+        return
+    try:
+        process.terminate()
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+    except ProcessLookupError:
+        pass
+
+# Relay tasks keep draining each child's output after it reports ready
+_relay_tasks = set()
+
+async def wait_for_banner(process, banner, timeout=30, failure_markers=()):
+    """Relay a child's output and wait until its readiness banner is printed
+
+    Returns False as soon as the child exits or prints one of failure_markers,
+    instead of waiting out the timeout.
+    """
+    ready = asyncio.Event()
+    failed = asyncio.Event()
+    
+    async def relay():
+        async for line in process.stdout:
+            line = line.decode(errors='replace')
+            sys.stdout.write(line)
+            if banner in line:
+                ready.set()
+            elif not ready.is_set() and any(marker in line for marker in failure_markers):
+                failed.set()
+        # EOF: the child exited (or closed its output) without the banner
+        failed.set()
+    
+    task = asyncio.create_task(relay())
+    _relay_tasks.add(task)
+    task.add_done_callback(_relay_tasks.discard)
+    
+    waiters = {asyncio.create_task(ready.wait()), asyncio.create_task(failed.wait())}
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+    if ready.is_set():
+        return True
+    if failed.is_set():
+        print("❌ Server failed or exited before reporting ready")
+    else:
+        print(f"❌ Server did not report ready within {timeout} seconds")
     return False
 
-def start_api_server():
+# With --reload the uvicorn supervisor outlives a worker that fails to start,
+# so its output never ends; these lines mean the worker is gone
+UVICORN_FAILURE_MARKERS = (
+    "Traceback (most recent call last)",
+    "Error loading ASGI app",
+    "Application startup failed",
+)
+
+async def start_api_server():
     """Start the FastAPI server"""
     print("🚀 Starting SaaS API server...")
     try:
         # Ensure port is free
-        kill_processes_on_port(8000)
+        await asyncio.to_thread(kill_processes_on_port, 8000)
         
-        process = subprocess.Popen([
+        process = await asyncio.create_subprocess_exec(
             sys.executable, "-m", "uvicorn", 
             "app.main:app", 
             "--reload", 
             "--host", "0.0.0.0", 
-            "--port", "8000"
-        ], cwd=Path(__file__).parent)
+            "--port", "8000",
+            # LogRequestsMiddleware already logs every request
+            "--no-access-log",
+            cwd=Path(__file__).parent, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        _server_processes[8000] = process
         
         # Wait for server to start (increased timeout for database connection)
-        if wait_for_port(8000, timeout=30):
+        if await wait_for_banner(process, "Application startup complete", timeout=30,
+                                 failure_markers=UVICORN_FAILURE_MARKERS):
             print("✅ API server started successfully")
             return process
         else:
             print("❌ API server failed to start")
-            process.terminate()
+            await _stop_server(8000)
             return None
     except Exception as e:
         print(f"❌ Failed to start API server: {e}")
         return None
 
-def start_unified_console():
+async def start_unified_console():
     """Start the unified console server"""
     print("🌐 Starting Unified Console server...")
     try:
         # Ensure port is free
-        kill_processes_on_port(8082)
-        
-        # Wait a moment for port to be fully released
-        time.sleep(1)
+        await asyncio.to_thread(kill_processes_on_port, 8082)
         
         unified_dir = Path(__file__).parent / "unified_console"
-        process = subprocess.Popen([
-            sys.executable, "server.py"
-        ], cwd=unified_dir)
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", "server.py",
+            cwd=unified_dir, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        _server_processes[8082] = process
         
         # Wait for server to start
-        if wait_for_port(8082, timeout=15):
+        if await wait_for_banner(process, "Unified Console Server running at", timeout=15):
             print("✅ Unified console started successfully")
             return process
         else:
             print("❌ Unified console failed to start")
-            process.terminate()
+            await _stop_server(8082)
             return None
     except Exception as e:
         print(f"❌ Failed to start unified console: {e}")
@@ -147,8 +234,9 @@ def show_status():
     print("📊 Server Status:")
     print("=" * 30)
     
-    api_pids = check_port(8000)
-    unified_pids = check_port(8082)
+    ports = _scan_ports({8000, 8082})
+    api_pids = ports[8000]
+    unified_pids = ports[8082]
     
     if api_pids:
         print(f"✅ SaaS API (port 8000): Running (PIDs: {', '.join(api_pids)})")
@@ -163,35 +251,21 @@ def show_status():
 def stop_all():
     """Stop all servers"""
     print("🛑 Stopping all servers...")
-    kill_processes_on_port(8000)
-    kill_processes_on_port(8082)
+    ports = _scan_ports({8000, 8082})
+    kill_processes_on_port(8000, ports[8000])
+    kill_processes_on_port(8082, ports[8082])
     print("✅ All servers stopped")
 
-def start_all():
-    """Start all servers"""
-    print("🎯 Starting SaaS API and Unified Console...")
-    print("=" * 40)
-    
-    # Stop any existing processes first
-    stop_all()
-    
-    # Wait a moment for ports to be fully released
-    time.sleep(2)
-    
-    # Start API server
-    api_process = start_api_server()
-    if not api_process:
-        print("❌ Failed to start API server")
-        return
-    
-    # Wait a moment before starting unified console
-    time.sleep(2)
-    
-    # Start unified console
-    unified_process = start_unified_console()
-    if not unified_process:
-        print("❌ Failed to start unified console")
-        api_process.terminate()
+async def _run_all():
+    """Start both servers concurrently and wait on them until interrupted"""
+    # The two startups are independent, so their readiness waits overlap
+    api_process, unified_process = await asyncio.gather(start_api_server(), start_unified_console())
+    if not api_process or not unified_process:
+        if not api_process:
+            print("❌ Failed to start API server")
+        if not unified_process:
+            print("❌ Failed to start unified console")
+        await asyncio.gather(_stop_server(8000), _stop_server(8082))
         return
     
     print("\n🎉 All servers are running!")
@@ -208,14 +282,26 @@ def start_all():
     
     try:
         # Wait for all processes
-        api_process.wait()
-        unified_process.wait()
-    except KeyboardInterrupt:
+        await asyncio.gather(api_process.wait(), unified_process.wait())
+    except asyncio.CancelledError:
+        # asyncio.run cancels the main task on Ctrl+C
         print("\n🛑 Stopping servers...")
-        api_process.terminate()
-        unified_process.terminate()
+        await asyncio.gather(_stop_server(8000), _stop_server(8082))
         print("✅ Servers stopped")
 
+def start_all():
+    """Start all servers"""
+    print("🎯 Starting SaaS API and Unified Console...")
+    print("=" * 40)
+    
+    # Stop any existing processes first
+    stop_all()
+    
+    try:
+        asyncio.run(_run_all())
+    except KeyboardInterrupt:
+        pass
+
 def main():
     """Main function"""
     if len(sys.argv) < 2:
@@ -253,7 +339,6 @@ def main():
         show_status()
     elif command == "restart":
         stop_all()
-        time.sleep(2)
         start_all()
     else:
         print(f"Unknown command: {command}")
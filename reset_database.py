@@ -18,22 +18,28 @@ Options:
 
 import os
 import sys
-import subprocess
+import hashlib
+import hmac
 from pathlib import Path
-from sqlalchemy import text, create_engine
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import insert, text, create_engine
 from sqlalchemy.exc import OperationalError
 
 # Add the project root to Python path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from app.core import auth_cache
 from app.core.config import settings
 from app.core.database import engine, SessionLocal
 from app.models import user, tenant, product
-from app.crud.user import create_user
-from app.schemas.user import UserCreate
 from app.core.security import get_password_hash
 
+# "<HMAC-SHA256 of SUPER_ADMIN_PASSWORD keyed with SECRET_KEY>\n<password hash>",
+# so repeated resets with an unchanged password skip the deliberately slow hashing
+SUPER_ADMIN_HASH_CACHE = project_root / '.super_admin_hash.cache'
+
 def print_banner():
     """Print a warning banner"""
     print("=" * 80)
@@ -57,98 +63,109 @@ def confirm_reset():
     return response in ['yes', 'y']
 
 def test_database_connection():
-    """Test if we can connect to the database"""
+    """Test if we can connect to the database and return the connection the reset runs on"""
     print("🔍 Testing database connection...")
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text('SELECT 1'))
-            print("✅ Database connection successful")
-            return True
+        conn = engine.connect()
+        conn.execute(text('SELECT 1'))
+        print("✅ Database connection successful")
+        return conn
     except OperationalError as e:
         print(f"❌ Database connection failed: {e}")
         print("Please check your DATABASE_URL in .env file")
-        return False
+        return None
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
-        return False
+        return None
 
-def clear_all_data():
+def clear_all_data(conn):
     """Clear all data from tables while preserving structure"""
     print("🗑️  Clearing all data from tables...")
     try:
-        with engine.connect() as conn:
-            # Get all table names (excluding alembic_version)
-            result = conn.execute(text("""
-                SELECT tablename FROM pg_tables 
-                WHERE schemaname = 'public' 
-                AND tablename NOT LIKE 'pg_%'
-                AND tablename NOT LIKE 'sql_%'
-                AND tablename != 'alembic_version'
-            """))
-            tables = [row[0] for row in result]
-            
-            if not tables:
-                print("ℹ️  No tables found to clear")
-                return True
-            
-            print(f"Found {len(tables)} tables to clear: {', '.join(tables)}")
-            
-            # Clear all data from tables (preserve structure)
-            for table in tables:
-                conn.execute(text(f'TRUNCATE TABLE "{table}" CASCADE'))
-                print(f"  ✅ Cleared data from table: {table}")
-            
-            conn.commit()
-            print("✅ All data cleared successfully")
+        # Get all table names (excluding alembic_version)
+        tables = conn.execute(text("""
+            SELECT tablename FROM pg_tables 
+            WHERE schemaname = 'public' 
+            AND tablename NOT LIKE 'pg_%'
+            AND tablename NOT LIKE 'sql_%'
+            AND tablename != 'alembic_version'
+        """)).scalars().all()
+        
+        if not tables:
+            print("ℹ️  No tables found to clear")
             return True
-            
+        
+        print(f"Found {len(tables)} tables to clear: {', '.join(tables)}")
+        
+        # Clear all data from tables (preserve structure) in one statement;
+        # RESTART IDENTITY also resets the id sequences
+        table_list = ', '.join(f'"{table}"' for table in tables)
+        conn.execute(text(f'TRUNCATE TABLE {table_list} RESTART IDENTITY CASCADE'))
+        print(f"  ✅ Cleared data from {len(tables)} tables")
+        
+        print("✅ All data cleared successfully")
+        return True
+        
     except Exception as e:
         print(f"❌ Error clearing data: {e}")
         return False
 
-def verify_migrations():
+def verify_migrations(conn):
     """Verify migrations are up to date"""
     print("🔍 Verifying migrations...")
+    # Drive Alembic in-process rather than spawning the CLI in a fresh interpreter
+    alembic_cfg = Config(str(project_root / 'alembic.ini'))
+    alembic_cfg.set_main_option('script_location', str(project_root / 'alembic'))
+    # Migrate on the reset's own connection; a second connection would block
+    # on the locks the TRUNCATE holds until the reset commits
+    alembic_cfg.attributes['connection'] = conn
     try:
         # Check if alembic_version table exists and has current version
-        result = subprocess.run(
-            ['alembic', 'current'],
-            capture_output=True,
-            text=True,
-            cwd=project_root
-        )
-        
-        if result.returncode == 0:
-            print("✅ Migrations are up to date")
-            return True
-        else:
-            print(f"⚠️  Migration check failed: {result.stderr}")
-            print("Running migrations to ensure schema is current...")
-            
-            # Run migrations to ensure schema is current
-            result = subprocess.run(
-                ['alembic', 'upgrade', 'head'],
-                capture_output=True,
-                text=True,
-                cwd=project_root
-            )
-            
-            if result.returncode == 0:
-                print("✅ Migrations completed successfully")
-                return True
-            else:
-                print(f"❌ Migration failed: {result.stderr}")
-                return False
-            
+        command.current(alembic_cfg)
+        print("✅ Migrations are up to date")
+        return True
     except Exception as e:
-        print(f"❌ Error checking migrations: {e}")
+        print(f"⚠️  Migration check failed: {e}")
+        print("Running migrations to ensure schema is current...")
+    
+    try:
+        # Run migrations to ensure schema is current
+        command.upgrade(alembic_cfg, 'head')
+        print("✅ Migrations completed successfully")
+        return True
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
         return False
 
-def create_super_admin():
+def get_super_admin_password_hash():
+    """Hash SUPER_ADMIN_PASSWORD, reusing the cached hash while the password is unchanged"""
+    # Keyed with SECRET_KEY so a leaked cache file cannot be brute forced offline on its own
+    password_digest = hmac.new(
+        settings.SECRET_KEY.encode(), settings.SUPER_ADMIN_PASSWORD.encode(), hashlib.sha256
+    ).hexdigest()
+    try:
+        cached_digest, cached_hash = SUPER_ADMIN_HASH_CACHE.read_text().split('\n', 1)
+        if hmac.compare_digest(cached_digest, password_digest):
+            return cached_hash
+    except (OSError, ValueError):
+        pass
+    
+    hashed_password = get_password_hash(settings.SUPER_ADMIN_PASSWORD)
+    try:
+        # Created owner-only, so the file is never readable by others, even briefly
+        fd = os.open(SUPER_ADMIN_HASH_CACHE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'w') as cache_file:
+            cache_file.write(f"{password_digest}\n{hashed_password}")
+    except OSError as e:
+        print(f"⚠️  Could not cache super admin password hash: {e}")
+    return hashed_password
+
+def create_super_admin(conn):
     """Create the super admin user"""
     print("👤 Creating super admin user...")
     try:
-        db = SessionLocal()
+        db = SessionLocal(bind=conn)
         
         # Check if super admin already exists
         existing_admin = db.query(user.User).filter(
@@ -160,18 +177,17 @@ def create_super_admin():
             db.close()
             return True
         
-        # Create super admin user
-        super_admin_data = UserCreate(
+        # Create super admin user with a single INSERT, using the cached hash
+        db.execute(insert(user.User).values(
             email=settings.SUPER_ADMIN_EMAIL,
-            password=settings.SUPER_ADMIN_PASSWORD,
+            hashed_password=get_super_admin_password_hash(),
             full_name="Super Administrator",
-            role="SUPER_ADMIN",
+            role=user.UserRole.SUPER_ADMIN.value,
             is_active=True,
             tenant_id=None  # Super admin doesn't belong to any tenant
-        )
-        
-        super_admin = create_user(db=db, user=super_admin_data)
-        print(f"✅ Super admin created: {super_admin.email}")
+        ))
+        db.commit()
+        print(f"✅ Super admin created: {settings.SUPER_ADMIN_EMAIL}")
         
         db.close()
         return True
@@ -180,29 +196,26 @@ def create_super_admin():
         print(f"❌ Error creating super admin: {e}")
         return False
 
-def verify_reset():
+def verify_reset(conn):
     """Verify the database reset was successful"""
     print("🔍 Verifying database reset...")
+    db = SessionLocal(bind=conn)
     try:
-        db = SessionLocal()
-        
         # Check tables exist
-        with engine.connect() as conn:
-            result = conn.execute(text("""
-                SELECT tablename FROM pg_tables 
-                WHERE schemaname = 'public' 
-                AND tablename IN ('users', 'tenants', 'products', 'alembic_version')
-            """))
-            tables = [row[0] for row in result]
-            
-            expected_tables = ['users', 'tenants', 'products', 'alembic_version']
-            missing_tables = set(expected_tables) - set(tables)
-            
-            if missing_tables:
-                print(f"❌ Missing tables: {missing_tables}")
-                return False
-            else:
-                print("✅ All required tables exist")
+        tables = conn.execute(text("""
+            SELECT tablename FROM pg_tables 
+            WHERE schemaname = 'public' 
+            AND tablename IN ('users', 'tenants', 'products', 'alembic_version')
+        """)).scalars().all()
+        
+        expected_tables = ['users', 'tenants', 'products', 'alembic_version']
+        missing_tables = set(expected_tables) - set(tables)
+        
+        if missing_tables:
+            print(f"❌ Missing tables: {missing_tables}")
+            return False
+        else:
+            print("✅ All required tables exist")
         
         # Check super admin exists
         admin = db.query(user.User).filter(
@@ -249,24 +262,29 @@ def main():
     print("🚀 Starting database reset...")
     
     # Step 1: Test connection
-    if not test_database_connection():
-        return False
-    
-    # Step 2: Clear all data
-    if not clear_all_data():
+    conn = test_database_connection()
+    if conn is None:
         return False
     
-    # Step 3: Verify migrations
-    if not verify_migrations():
-        return False
-    
-    # Step 4: Create super admin
-    if not create_super_admin():
-        return False
+    # Every step runs on this one connection and transaction, so a failed
+    # step leaves the database as it was
+    with conn:
+        steps = [
+            clear_all_data,      # Step 2: Clear all data
+            verify_migrations,   # Step 3: Verify migrations
+            create_super_admin,  # Step 4: Create super admin
+            verify_reset,        # Step 5: Verify reset
+        ]
+        for step in steps:
+            if not step(conn):
+                conn.rollback()
+                print("❌ Database reset rolled back")
+                return False
+        conn.commit()
     
-    # Step 5: Verify reset
-    if not verify_reset():
-        return False
+    # Cached tokens still resolve to the deleted users and their old tenant IDs
+    print("🗃️  Clearing cached auth entries...")
+    auth_cache.clear_all()
     
     print("\n" + "=" * 80)
     print("🎉 DATABASE RESET COMPLETED SUCCESSFULLY!")
@@ -8,7 +8,6 @@ import os
 import sys
 import subprocess
 import secrets
-import string
 
 def run_command(command, description):
     """Run a command and handle errors."""
@@ -24,8 +23,8 @@ def run_command(command, description):
 
 def generate_secret_key():
     """Generate a secure secret key."""
-    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
-    return ''.join(secrets.choice(alphabet) for _ in range(32))
+    # 24 random bytes from a single urandom read, base64url-encoded to 32 chars
+    return secrets.token_urlsafe(24)
 
 def create_env_file():
     """Create .env file from template."""
@@ -37,17 +36,15 @@ def create_env_file():
         print("❌ env.example not found!")
         return False
     
-    # Read template
-    with open('env.example', 'r') as f:
-        content = f.read()
-    
     # Generate secret key
     secret_key = generate_secret_key()
-    content = content.replace('your-super-secret-key-here-change-this-in-production', secret_key)
     
-    # Write .env file
-    with open('.env', 'w') as f:
-        f.write(content)
+    # Stream the template into .env, filling in the SECRET_KEY entry
+    with open('env.example', 'r') as template, open('.env', 'w') as f:
+        for line in template:
+            if line.startswith('SECRET_KEY='):
+                line = f'SECRET_KEY={secret_key}\n'
+            f.write(line)
     
     print("✅ Created .env file with generated secret key")
     return True
@@ -3,10 +3,24 @@
 Test External APIs
 """
 
+import pytest
 import requests
 import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from api_test_helpers import ensure_bootstrap, get_or_login, raw_get, send_json
 
-API_BASE_URL = "http://localhost:8000"
+# Needs a running server; skipped otherwise
+pytestmark = pytest.mark.usefixtures("api_server")
+
+API_HOST = "localhost"
+API_PORT = 8000
+API_BASE_URL = f"http://{API_HOST}:{API_PORT}"
+
+# One pooled session, so every call reuses the same keep-alive connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=32, max_retries=0))
 
 def test_external_apis():
     """Test the external APIs with an API user token"""
@@ -20,68 +34,24 @@ def test_external_apis():
         "password": "your-super-admin-password"
     }
     
-    response = requests.post(f"{API_BASE_URL}/api/v1/auth/token", data=admin_login_data)
-    if response.status_code != 200:
-        print("❌ Super admin login failed")
-        return
-    
-    admin_token = response.json()["access_token"]
-    headers = {"Authorization": f"Bearer {admin_token}"}
-    
-    # 2. Create a tenant
-    import time
-    timestamp = int(time.time())
-    tenant_data = {
-        "name": f"Demo Company {timestamp}",
-        "domain": f"demo{timestamp}.com",
-        "is_active": True
-    }
+    admin_token = get_or_login(SESSION, f"{API_BASE_URL}/api/v1/auth/token", **admin_login_data)
+    if not admin_token:
+        pytest.fail("❌ Super admin login failed")
     
-    response = requests.post(f"{API_BASE_URL}/api/v1/admin/tenants/", 
-                           headers=headers, 
-                           json=tenant_data)
+    SESSION.headers["Authorization"] = f"Bearer {admin_token}"
     
-    if response.status_code != 200:
-        print("❌ Failed to create tenant")
-        return
+    # 2. Tenant and 3. API user, reused from earlier runs when they still exist
+    bootstrap = ensure_bootstrap(SESSION, f"{API_BASE_URL}/api/v1")
+    if not bootstrap:
+        pytest.fail("❌ Failed to prepare tenant and API user")
     
-    tenant = response.json()
+    tenant, api_token = bootstrap
     tenant_id = tenant['id']
-    print(f"✅ Created tenant: {tenant['name']} (ID: {tenant_id})")
-    
-    # 3. Create an API user
-    user_data = {
-        "full_name": "Demo API User",
-        "email": f"demo{timestamp}@test.com",
-        "password": "demo123",
-        "role": "API_USER",
-        "tenant_id": tenant_id,
-        "is_active": True
-    }
-    
-    response = requests.post(f"{API_BASE_URL}/api/v1/admin/users/", 
-                           headers=headers, 
-                           json=user_data)
-    
-    if response.status_code != 200:
-        print("❌ Failed to create API user")
-        return
-    
-    print("✅ Created API user")
+    print(f"✅ Tenant ready: {tenant['name']} (ID: {tenant_id})")
+    print("✅ API user ready")
     
-    # 4. Login as API user
-    api_login_data = {
-        "username": f"demo{timestamp}@test.com",
-        "password": "demo123"
-    }
-    
-    response = requests.post(f"{API_BASE_URL}/api/v1/auth/token", data=api_login_data)
-    if response.status_code != 200:
-        print("❌ API user login failed")
-        return
-    
-    api_token = response.json()["access_token"]
-    api_headers = {"Authorization": f"Bearer {api_token}"}
+    # 4. API user token
+    SESSION.headers["Authorization"] = f"Bearer {api_token}"
     
     print("✅ API user login successful")
     print(f"🔑 Token: {api_token[:20]}...")
@@ -90,11 +60,35 @@ def test_external_apis():
     print("\n📡 Testing External APIs:")
     print("-" * 30)
     
+    echo_data = {"test": "message", "number": 42, "boolean": True}
+    probes = [
+        ("GET", "health", None),
+        ("GET", "status", None),
+        ("GET", "profile", None),
+        ("GET", "tenant", None),
+        ("GET", "ping", None),
+        ("POST", "echo", echo_data),
+    ]
+    
+    def do_probe(method, endpoint, body):
+        path = f"/api/v1/external/{endpoint}"
+        # Body-less GETs go over a bare http.client connection; JSON posts keep the session
+        if method == "GET":
+            return raw_get(API_HOST, API_PORT, path, api_token)
+        response = send_json(SESSION, method, f"{API_BASE_URL}{path}", body)
+        return response.status_code, response.content
+    
+    # The probes are independent, so send them concurrently and report in order
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = {endpoint: executor.submit(do_probe, method, endpoint, body)
+                   for method, endpoint, body in probes}
+    responses = {endpoint: future.result() for endpoint, future in futures.items()}
+    
     # Health Check
     print("\n1. Health Check (/api/v1/external/health):")
-    response = requests.get(f"{API_BASE_URL}/api/v1/external/health", headers=api_headers)
-    if response.status_code == 200:
-        health_data = response.json()
+    status, body = responses["health"]
+    if status == 200:
+        health_data = orjson.loads(body)
         print("✅ Health check successful")
         print(f"   Status: {health_data['status']}")
         print(f"   Message: {health_data['message']}")
@@ -102,14 +96,14 @@ def test_external_apis():
         print(f"   Tenant ID: {health_data['tenant_id']}")
         print(f"   Timestamp: {health_data['timestamp']}")
     else:
-        print(f"❌ Health check failed: {response.status_code}")
-        print(response.text)
+        print(f"❌ Health check failed: {status}")
+        print(body.decode())
     
     # Service Status
     print("\n2. Service Status (/api/v1/external/status):")
-    response = requests.get(f"{API_BASE_URL}/api/v1/external/status", headers=api_headers)
-    if response.status_code == 200:
-        status_data = response.json()
+    status, body = responses["status"]
+    if status == 200:
+        status_data = orjson.loads(body)
         print("✅ Service status successful")
         print(f"   Service: {status_data['service']}")
         print(f"   Version: {status_data['version']}")
@@ -117,14 +111,14 @@ def test_external_apis():
         print(f"   User: {status_data['user']['email']}")
         print(f"   Tenant: {status_data['user']['tenant_id']}")
     else:
-        print(f"❌ Service status failed: {response.status_code}")
-        print(response.text)
+        print(f"❌ Service status failed: {status}")
+        print(body.decode())
     
     # User Profile
     print("\n3. User Profile (/api/v1/external/profile):")
-    response = requests.get(f"{API_BASE_URL}/api/v1/external/profile", headers=api_headers)
-    if response.status_code == 200:
-        profile_data = response.json()
+    status, body = responses["profile"]
+    if status == 200:
+        profile_data = orjson.loads(body)
         print("✅ User profile successful")
         print(f"   Name: {profile_data['full_name']}")
         print(f"   Email: {profile_data['email']}")
@@ -132,63 +126,64 @@ def test_external_apis():
         print(f"   Tenant ID: {profile_data['tenant_id']}")
         print(f"   Active: {profile_data['is_active']}")
     else:
-        print(f"❌ User profile failed: {response.status_code}")
-        print(response.text)
+        print(f"❌ User profile failed: {status}")
+        print(body.decode())
     
     # Tenant Info
     print("\n4. Tenant Info (/api/v1/external/tenant):")
-    response = requests.get(f"{API_BASE_URL}/api/v1/external/tenant", headers=api_headers)
-    if response.status_code == 200:
-        tenant_data = response.json()
+    status, body = responses["tenant"]
+    if status == 200:
+        tenant_data = orjson.loads(body)
         print("✅ Tenant info successful")
         print(f"   Name: {tenant_data['name']}")
         print(f"   Domain: {tenant_data['domain']}")
         print(f"   Active: {tenant_data['is_active']}")
         print(f"   ID: {tenant_data['id']}")
     else:
-        print(f"❌ Tenant info failed: {response.status_code}")
-        print(response.text)
+        print(f"❌ Tenant info failed: {status}")
+        print(body.decode())
     
     # Ping
     print("\n5. Ping (/api/v1/external/ping):")
-    response = requests.get(f"{API_BASE_URL}/api/v1/external/ping", headers=api_headers)
-    if response.status_code == 200:
-        ping_data = response.json()
+    status, body = responses["ping"]
+    if status == 200:
+        ping_data = orjson.loads(body)
         print("✅ Ping successful")
         print(f"   Pong: {ping_data['pong']}")
         print(f"   User ID: {ping_data['user_id']}")
         print(f"   Timestamp: {ping_data['timestamp']}")
     else:
-        print(f"❌ Ping failed: {response.status_code}")
-        print(response.text)
+        print(f"❌ Ping failed: {status}")
+        print(body.decode())
     
     # Echo
     print("\n6. Echo (/api/v1/external/echo):")
-    echo_data = {"test": "message", "number": 42, "boolean": True}
-    response = requests.post(f"{API_BASE_URL}/api/v1/external/echo", 
-                           headers=api_headers, 
-                           json=echo_data)
-    if response.status_code == 200:
-        echo_response = response.json()
+    status, body = responses["echo"]
+    if status == 200:
+        echo_response = orjson.loads(body)
         print("✅ Echo successful")
         print(f"   Message: {echo_response['message']}")
         print(f"   Echo: {echo_response['echo']}")
         print(f"   User ID: {echo_response['user_id']}")
         print(f"   Tenant ID: {echo_response['tenant_id']}")
     else:
-        print(f"❌ Echo failed: {response.status_code}")
-        print(response.text)
+        print(f"❌ Echo failed: {status}")
+        print(body.decode())
+    
+    failed_probes = [endpoint for endpoint, (status, _) in responses.items() if status != 200]
+    if failed_probes:
+        pytest.fail(f"❌ External endpoints failed: {', '.join(failed_probes)}")
     
     # 6. Test Access Control
     print("\n🔒 Testing Access Control:")
     print("-" * 30)
     
     # Try to access admin endpoint (should fail)
-    response = requests.get(f"{API_BASE_URL}/api/v1/admin/tenants/", headers=api_headers)
+    response = SESSION.get(f"{API_BASE_URL}/api/v1/admin/tenants/")
     if response.status_code == 403:
         print("✅ Access control working - API user cannot access admin endpoints")
     else:
-        print(f"⚠️  Access control issue - API user can access admin endpoints: {response.status_code}")
+        pytest.fail(f"⚠️  Access control issue - API user can access admin endpoints: {response.status_code}")
     
     print("\n" + "=" * 40)
     print("🎯 External API Summary:")
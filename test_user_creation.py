@@ -6,36 +6,32 @@ Test script to verify user creation with tenant_id and token generation
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from api_test_helpers import get_or_login
 
 # Configuration
 API_BASE_URL = "http://localhost:8000/api/v1"
 ADMIN_EMAIL = "admin@yourcompany.com"
 ADMIN_PASSWORD = "your-super-admin-password"
 
+# One pooled session, so every call reuses the same keep-alive connection.
+# main() sets its Authorization header to whichever token the next steps need.
+SESSION = requests.Session()
+SESSION.headers.update({"Accept": "application/json"})
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 def get_admin_token():
-    """Get admin access token"""
-    response = requests.post(
-        f"{API_BASE_URL}/auth/token",
-        data={
-            "username": ADMIN_EMAIL,
-            "password": ADMIN_PASSWORD
-        }
-    )
-    
-    if response.status_code == 200:
-        return response.json()["access_token"]
-    else:
-        print(f"❌ Failed to get admin token: {response.status_code}")
-        print(response.text)
-        return None
+    """Get admin access token, reusing the one cached by an earlier run while it is still valid"""
+    token = get_or_login(SESSION, f"{API_BASE_URL}/auth/token", ADMIN_EMAIL, ADMIN_PASSWORD)
+    if not token:
+        print("❌ Failed to get admin token")
+    return token
 
-def create_test_tenant(token):
+def create_test_tenant():
     """Create a test tenant"""
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    response = requests.post(
+    response = SESSION.post(
         f"{API_BASE_URL}/admin/tenants/",
-        headers=headers,
         json={
             "name": "Test Company",
             "domain": "testcompany.com",
@@ -52,13 +48,10 @@ def create_test_tenant(token):
         print(response.text)
         return None
 
-def create_api_user(token, tenant_id):
+def create_api_user(tenant_id):
     """Create an API user with tenant_id"""
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    response = requests.post(
+    response = SESSION.post(
         f"{API_BASE_URL}/admin/users/",
-        headers=headers,
         json={
             "full_name": "Test API User",
             "email": "api@testcompany.com",
@@ -81,14 +74,9 @@ def create_api_user(token, tenant_id):
         print(response.text)
         return None
 
-def generate_user_token(token, user_id):
+def generate_user_token(user_id):
     """Generate a bearer token for the API user"""
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    response = requests.post(
-        f"{API_BASE_URL}/admin/users/{user_id}/generate-token",
-        headers=headers
-    )
+    response = SESSION.post(f"{API_BASE_URL}/admin/users/{user_id}/generate-token")
     
     if response.status_code == 200:
         token_data = response.json()
@@ -102,15 +90,10 @@ def generate_user_token(token, user_id):
         print(response.text)
         return None
 
-def test_api_user_access(api_token):
+def test_api_user_access():
     """Test that the API user can access external APIs"""
-    headers = {"Authorization": f"Bearer {api_token}"}
-    
     # Test health check
-    response = requests.get(
-        f"{API_BASE_URL}/external/health",
-        headers=headers
-    )
+    response = SESSION.get(f"{API_BASE_URL}/external/health")
     
     if response.status_code == 200:
         health_data = response.json()
@@ -124,14 +107,9 @@ def test_api_user_access(api_token):
         print(response.text)
         return False
 
-def test_admin_api_access(api_token):
+def test_admin_api_access():
     """Test that API user cannot access admin APIs"""
-    headers = {"Authorization": f"Bearer {api_token}"}
-    
-    response = requests.get(
-        f"{API_BASE_URL}/admin/tenants/",
-        headers=headers
-    )
+    response = SESSION.get(f"{API_BASE_URL}/admin/tenants/")
     
     if response.status_code == 403:
         print("✅ API user correctly denied access to admin APIs")
@@ -149,32 +127,37 @@ def main():
     admin_token = get_admin_token()
     if not admin_token:
         return
+    SESSION.headers["Authorization"] = f"Bearer {admin_token}"
     
     # Step 2: Create test tenant
     print("\n2. Creating test tenant...")
-    tenant = create_test_tenant(admin_token)
+    tenant = create_test_tenant()
     if not tenant:
         return
     
     # Step 3: Create API user with tenant_id
     print("\n3. Creating API user with tenant_id...")
-    user = create_api_user(admin_token, tenant['id'])
+    user = create_api_user(tenant['id'])
     if not user:
         return
     
     # Step 4: Generate token for API user
     print("\n4. Generating bearer token for API user...")
-    token_data = generate_user_token(admin_token, user['id'])
+    token_data = generate_user_token(user['id'])
     if not token_data:
         return
     
-    # Step 5: Test API user access to external APIs
-    print("\n5. Testing API user access to external APIs...")
-    test_api_user_access(token_data['access_token'])
+    # The remaining checks run as the API user
+    SESSION.headers["Authorization"] = f"Bearer {token_data['access_token']}"
     
-    # Step 6: Test that API user cannot access admin APIs
-    print("\n6. Testing API user access restrictions...")
-    test_admin_api_access(token_data['access_token'])
+    # Steps 5 and 6 are independent requests, so they share the pool concurrently
+    print("\n5. Testing API user access to external APIs...")
+    print("6. Testing API user access restrictions...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        user_access = executor.submit(test_api_user_access)
+        admin_access = executor.submit(test_admin_api_access)
+    user_access.result()
+    admin_access.result()
     
     print("\n" + "=" * 50)
     print("🎉 Test completed!")
@@ -3,20 +3,104 @@
 Simple HTTP server for Unified Console
 """
 
+import gzip
+import hashlib
 import http.server
-import socketserver
+import mimetypes
 import os
 import sys
 from pathlib import Path
+from urllib.parse import unquote, urlsplit
 
 # Get the directory where this script is located
 SCRIPT_DIR = Path(__file__).parent.absolute()
 PORT = 8082
 
+# Console files preloaded at startup:
+# relative path -> (body, gzipped body or None, etag, content type, cache control)
+FILES = {}
+
+# Text types worth sending gzipped
+COMPRESSIBLE_TYPES = {"application/javascript", "application/json", "image/svg+xml"}
+
+def load_files():
+    """Read every console file into FILES so requests are served from memory"""
+    FILES.clear()
+    for root, dirs, names in os.walk(SCRIPT_DIR):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in names:
+            path = Path(root) / name
+            data = path.read_bytes()
+            # Weak, since the gzipped and identity bodies share one validator
+            etag = f'W/"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            
+            gzipped = None
+            if content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES:
+                gzipped = gzip.compress(data, compresslevel=6)
+                if len(gzipped) >= len(data):
+                    gzipped = None
+            
+            # Pages revalidate on every load so they pick up new assets; assets are not
+            # fingerprinted, so they get a bounded lifetime rather than immutable
+            if content_type == "text/html":
+                cache_control = "public, max-age=0, must-revalidate"
+            else:
+                cache_control = "public, max-age=3600"
+            
+            FILES[path.relative_to(SCRIPT_DIR).as_posix()] = (data, gzipped, etag, content_type, cache_control)
+
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(SCRIPT_DIR), **kwargs)
     
+    def do_GET(self):
+        self.send_cached(send_body=True)
+    
+    def do_HEAD(self):
+        self.send_cached(send_body=False)
+    
+    def send_cached(self, send_body):
+        """Serve a preloaded file, answering a matching If-None-Match with 304"""
+        path = unquote(urlsplit(self.path).path).lstrip("/")
+        if path == "" or path.endswith("/"):
+            path += "index.html"
+        cached = FILES.get(path)
+        if cached is None:
+            self.send_error(404, "File not found")
+            return
+        
+        data, gzipped, etag, content_type, cache_control = cached
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            self.send_response(304)
+            self.send_validators(gzipped, etag, cache_control)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if gzipped is not None and self.accepts_gzip():
+            data = gzipped
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_validators(gzipped, etag, cache_control)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+    
+    def send_validators(self, gzipped, etag, cache_control):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        if gzipped is not None:
+            self.send_header("Vary", "Accept-Encoding")
+    
+    def accepts_gzip(self):
+        for coding in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = coding.partition(";")
+            if name.strip().lower() == "gzip":
+                return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+        return False
+    
     def end_headers(self):
         # Add CORS headers
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -31,8 +115,13 @@ def main():
     print(f"🌐 Server will run at: http://localhost:{PORT}")
     print("Press Ctrl+C to stop the server")
     
+    # Files are cached at startup, so restart the server after editing them
+    load_files()
+    print(f"📦 Cached {len(FILES)} files in memory")
+    
     try:
-        with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
+        # One thread per connection, so a slow client cannot block the browser's parallel requests
+        with http.server.ThreadingHTTPServer(("", PORT), MyHTTPRequestHandler) as httpd:
             print(f"✅ Unified Console Server running at http://localhost:{PORT}")
             print(f"🌐 Open your browser and go to: http://localhost:{PORT}")
             httpd.serve_forever()